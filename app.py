@@ -1,18 +1,17 @@
 """MC THE MAX 초성퀴즈 Flask 웹앱."""
 
 import hmac
-import re
-from difflib import SequenceMatcher
 from functools import wraps
 
 from flask import Flask, render_template, request, session, redirect, url_for, jsonify
 
-from config import FLASK_SECRET_KEY, QUIZ_QUESTION_COUNT, ADMIN_TOKEN
-from db import (
-    init_db, get_quiz_questions, get_quiz_questions_mixed,
-    get_quiz_question_by_id,
-    get_difficulty_stats, get_total_songs, get_total_lines,
+from config import FLASK_SECRET_KEY, ADMIN_TOKEN
+from game import (
+    cached_index_context, index_context, load_questions, load_practice_questions,
+    start_quiz, grade_answer, record_result, quiz_total,
 )
+from search import search
+from db import init_db, get_quiz_question_by_id, get_difficulty_stats
 
 app = Flask(__name__)
 app.secret_key = FLASK_SECRET_KEY
@@ -30,59 +29,21 @@ def require_admin(f):
     return decorated
 
 
-def normalize_title(title: str) -> str:
-    """곡명 비교를 위해 정규화 (괄호 안 버전 정보 제거, 소문자, 공백 제거)."""
-    title = re.sub(r"\(.*?\)", "", title)  # remove parenthetical
-    title = re.sub(r"[^\w가-힣]", "", title)  # keep only word chars + hangul
-    return title.strip().lower()
-
-
-def check_lyrics(answer: str, correct: str) -> tuple[int, str]:
-    """가사 정답 체크. (점수, 판정)을 반환."""
-    a = answer.strip()
-    c = correct.strip()
-    if a == c:
-        return 50, "exact"
-    if not a:
-        return 0, "wrong"
-    ratio = SequenceMatcher(None, a, c).ratio()
-    if ratio >= 0.8:
-        return 25, "partial"
-    return 0, "wrong"
-
-
 @app.route("/")
 def index():
-    stats = get_difficulty_stats()
-    total_songs = get_total_songs()
-    total_lines = get_total_lines()
-    total_quiz = sum(stats.values())
-    return render_template("index.html", stats=stats, total_songs=total_songs,
-                           total_lines=total_lines, total_quiz=total_quiz)
+    return render_template("index.html", **(cached_index_context() or index_context()))
 
 
 @app.route("/quiz/start", methods=["POST"])
 def quiz_start():
     difficulty = request.form.get("difficulty", "normal")
-
-    if difficulty == "mixed":
-        questions = get_quiz_questions_mixed(QUIZ_QUESTION_COUNT)
-    else:
-        questions = get_quiz_questions(difficulty, QUIZ_QUESTION_COUNT)
+    mode = "lyrics" if request.form.get("mode") == "lyrics" else "title"
+    questions = load_questions(difficulty)
 
     if not questions:
         return redirect(url_for("index"))
 
-    # Session stores only IDs + display info (no answers)
-    session["quiz_ids"] = [q["quiz_id"] for q in questions]
-    session["quiz_display"] = [
-        {"chosung": q["chosung"], "char_count": q["char_count"], "difficulty": q["difficulty"]}
-        for q in questions
-    ]
-    session["current"] = 0
-    session["score"] = 0
-    session["results"] = []
-    session["difficulty"] = difficulty
+    start_quiz(session, questions, difficulty, mode)
     return redirect(url_for("quiz_question"))
 
 
@@ -97,7 +58,8 @@ def quiz_question():
 
     q = display[current]
     return render_template("quiz.html", question=q, current=current + 1,
-                           total=len(quiz_ids), score=session.get("score", 0))
+                           total=len(quiz_ids), score=session.get("score", 0),
+                           mode=session.get("mode", "title"))
 
 
 @app.route("/quiz/answer", methods=["POST"])
@@ -114,26 +76,9 @@ def quiz_answer():
         return redirect(url_for("quiz_result"))
 
     title_answer = request.form.get("title", "").strip()
-
-    # Score title only
-    correct = normalize_title(title_answer) == normalize_title(q["title"])
-
-    result = {
-        "question_no": current + 1,
-        "chosung": q["chosung"],
-        "correct_title": q["title"],
-        "correct_lyrics": q["line_text"],
-        "user_title": title_answer,
-        "correct": correct,
-        "score": 100 if correct else 0,
-        "difficulty": q.get("difficulty", ""),
-    }
-
-    session["score"] = session.get("score", 0) + result["score"]
-    results = session.get("results", [])
-    results.append(result)
-    session["results"] = results
-    session["current"] = current + 1
+    lyrics_answer = request.form.get("lyrics", "") if session.get("mode") == "lyrics" else None
+    result = grade_answer(q, current, title_answer, lyrics_answer)
+    record_result(session, result)
 
     # Return JSON for AJAX
     if request.headers.get("X-Requested-With") == "XMLHttpRequest":
@@ -146,12 +91,35 @@ def quiz_answer():
 def quiz_result():
     results = session.get("results", [])
     score = session.get("score", 0)
-    total = len(results) * 100 if results else 1
+    total = quiz_total(results)
     difficulty = session.get("difficulty", "")
     return render_template("result.html", results=results, score=score,
                            total=total, difficulty=difficulty)
 
 
+@app.route("/search")
+def search_page():
+    query = request.args.get("q", "").strip()
+    results = search(query) if query else {"lines": [], "songs": [], "too_short": False}
+
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        return jsonify({"query": query, **results})
+
+    return render_template("search.html", query=query, **results)
+
+
+@app.route("/search/practice", methods=["POST"])
+def search_practice():
+    query = request.form.get("q", "").strip()
+    questions = load_practice_questions(query)
+
+    if not questions:
+        return redirect(url_for("search_page", q=query))
+
+    start_quiz(session, questions, "practice")
+    return redirect(url_for("quiz_question"))
+
+
 @app.route("/admin/scrape", methods=["POST"])
 @require_admin
 def admin_scrape():
@@ -0,0 +1,212 @@
+"""ASGI entrypoint (Quart).
+
+wsgi.py와 같은 라우트/템플릿을 async 핸들러로 제공한다.
+DB 조회는 전용 스레드 풀(스레드별 읽기 전용 커넥션)에서 실행하고,
+관리자 작업(크롤링/분류)은 백그라운드 태스크로 돌린다.
+
+    hypercorn asgi:application --bind 0.0.0.0:8000 --backlog 2048 --keep-alive 60
+
+측정 (1코어, 프로세스 1개, bench.py; gunicorn gthread 32스레드 대비):
+
+    GET "/" (동시 200)                          WSGI 178 / ASGI 140 req/s
+    GET "/search?q=ㄱㄷ" (동시 200)             WSGI  77 / ASGI  38-42 req/s
+    퀴즈 진행 (사용자 50, 쿠키, 가사 모드)      WSGI 202 / ASGI 164 req/s
+      + 느린 클라이언트 16                      WSGI 176 / ASGI 163 req/s
+      + 느린 클라이언트 64                      WSGI 2.8 (p50 33s) / ASGI 139 req/s (p50 0.28s)
+    GET "/" (동시 50) + 느린 클라이언트 64      WSGI 2.2 (p50 32s) / ASGI 98 req/s
+
+결론: 이 모드는 "같은 박스에서 더 많은 동시 사용자"라는 목표를 일반적으로는 달성하지
+못한다. 이 앱의 요청은 거의 CPU(템플릿, 검색, 채점)라 GIL 아래에서 async가 이득이
+없고, Quart의 async Jinja 렌더링이 요청당 ~0.3ms 더 들어 10-50% 느리다.
+ASGI가 이기는 경우는 본문을 느리게 보내는 연결이 gthread 스레드 수보다 많을 때뿐이고,
+이건 WSGI 앞에 요청을 버퍼링하는 리버스 프록시(nginx 등)를 두어도 해결된다.
+그래서 기본 배포는 WSGI(gthread)이고, 프록시 없이 서버를 바로 노출할 때만 이 모드를 쓴다.
+관리자 크롤링/분류 중 부하는 네트워크/API 키가 필요해 측정하지 않았다
+(WSGI에서는 그 요청이 스레드 하나를 작업 내내 붙잡고, 여기서는 백그라운드 태스크다).
+"""
+
+import asyncio
+import hmac
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from quart import Quart, render_template, request, session, redirect, url_for, jsonify
+
+from game import (
+    cached_index_context, index_context, load_questions, load_practice_questions,
+    start_quiz, grade_answer, record_result, quiz_total,
+)
+from config import FLASK_SECRET_KEY, ADMIN_TOKEN, DB_READ_WORKERS
+from db import init_db, get_quiz_question_by_id, get_difficulty_stats
+from search import search
+
+app = Quart(__name__)
+app.secret_key = FLASK_SECRET_KEY
+
+db_executor = ThreadPoolExecutor(max_workers=DB_READ_WORKERS, thread_name_prefix="db-read")
+admin_jobs: dict[str, dict] = {}
+
+
+async def run_db(fn, *args):
+    """블로킹 DB 함수를 DB 전용 스레드 풀에서 실행한다."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, partial(fn, *args))
+
+
+def require_admin(f):
+    @wraps(f)
+    async def decorated(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({"error": "admin not configured"}), 403
+        token = request.headers.get("X-Admin-Token", "")
+        if not token or not hmac.compare_digest(token, ADMIN_TOKEN):
+            return jsonify({"error": "unauthorized"}), 403
+        return await f(*args, **kwargs)
+    return decorated
+
+
+@app.route("/")
+async def index():
+    ctx = cached_index_context() or await run_db(index_context)
+    return await render_template("index.html", **ctx)
+
+
+@app.route("/quiz/start", methods=["POST"])
+async def quiz_start():
+    form = await request.form
+    difficulty = form.get("difficulty", "normal")
+    mode = "lyrics" if form.get("mode") == "lyrics" else "title"
+    questions = await run_db(load_questions, difficulty)
+
+    if not questions:
+        return redirect(url_for("index"))
+
+    start_quiz(session, questions, difficulty, mode)
+    return redirect(url_for("quiz_question"))
+
+
+@app.route("/quiz/question")
+async def quiz_question():
+    quiz_ids = session.get("quiz_ids")
+    display = session.get("quiz_display")
+    current = session.get("current", 0)
+
+    if not quiz_ids or current >= len(quiz_ids):
+        return redirect(url_for("quiz_result"))
+
+    q = display[current]
+    return await render_template("quiz.html", question=q, current=current + 1,
+                                 total=len(quiz_ids), score=session.get("score", 0),
+                                 mode=session.get("mode", "title"))
+
+
+@app.route("/quiz/answer", methods=["POST"])
+async def quiz_answer():
+    quiz_ids = session.get("quiz_ids")
+    current = session.get("current", 0)
+
+    if not quiz_ids or current >= len(quiz_ids):
+        return redirect(url_for("quiz_result"))
+
+    # Fetch correct answer from DB (not from session)
+    q = await run_db(get_quiz_question_by_id, quiz_ids[current])
+    if not q:
+        return redirect(url_for("quiz_result"))
+
+    form = await request.form
+    title_answer = form.get("title", "").strip()
+    lyrics_answer = form.get("lyrics", "") if session.get("mode") == "lyrics" else None
+    # grade_answer hits the DB (correct-lyrics cache) in lyrics mode
+    result = await run_db(grade_answer, q, current, title_answer, lyrics_answer)
+    record_result(session, result)
+
+    # Return JSON for AJAX
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        return jsonify(result)
+
+    return redirect(url_for("quiz_question"))
+
+
+@app.route("/quiz/result")
+async def quiz_result():
+    results = session.get("results", [])
+    score = session.get("score", 0)
+    total = quiz_total(results)
+    difficulty = session.get("difficulty", "")
+    return await render_template("result.html", results=results, score=score,
+                                 total=total, difficulty=difficulty)
+
+
+@app.route("/search")
+async def search_page():
+    query = request.args.get("q", "").strip()
+    results = await run_db(search, query) if query else {"lines": [], "songs": [], "too_short": False}
+
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        return jsonify({"query": query, **results})
+
+    return await render_template("search.html", query=query, **results)
+
+
+@app.route("/search/practice", methods=["POST"])
+async def search_practice():
+    form = await request.form
+    query = form.get("q", "").strip()
+    questions = await run_db(load_practice_questions, query)
+
+    if not questions:
+        return redirect(url_for("search_page", q=query))
+
+    start_quiz(session, questions, "practice")
+    return redirect(url_for("quiz_question"))
+
+
+# --- Admin (background jobs) ---
+
+def _run_admin_job(name: str, fn):
+    """관리자 작업을 실행하고 결과/오류를 admin_jobs에 기록한다. 워커 스레드에서 호출된다."""
+    try:
+        admin_jobs[name] = {"status": "done", "result": fn()}
+    except Exception as e:
+        admin_jobs[name] = {"status": "error", "error": str(e)}
+
+
+def _start_admin_job(name: str, fn):
+    if admin_jobs.get(name, {}).get("status") == "running":
+        return jsonify({"error": f"{name} already running"}), 409
+    admin_jobs[name] = {"status": "running"}
+    app.add_background_task(_run_admin_job, name, fn)
+    return jsonify({"job": name, "status": "running"}), 202
+
+
+def _scrape():
+    from scraper import scrape_all
+    return scrape_all()
+
+
+def _classify():
+    from classify import classify_all
+    classify_all()
+    return get_difficulty_stats()
+
+
+@app.route("/admin/scrape", methods=["POST"])
+@require_admin
+async def admin_scrape():
+    return _start_admin_job("scrape", _scrape)
+
+
+@app.route("/admin/classify", methods=["POST"])
+@require_admin
+async def admin_classify():
+    return _start_admin_job("classify", _classify)
+
+
+@app.route("/admin/jobs")
+@require_admin
+async def admin_jobs_status():
+    return jsonify(admin_jobs)
+
+
+init_db()
+application = app
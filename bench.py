@@ -0,0 +1,205 @@
+"""WSGI vs ASGI 동시성 벤치마크.
+
+같은 머신에서 두 서버를 각각 프로세스 1개로 띄우고, 같은 부하를 걸어
+처리량(req/s)과 지연 시간을 비교한다.
+
+    --scenario get    한 경로에 GET만 (CPU 위주)
+    --scenario quiz   사용자마다 쿠키 세션으로 시작 → 문제/답 10번 → 결과 (가사 모드)
+    --slow-clients N  측정하는 동안 N개 연결이 /quiz/answer 본문을 조금씩 흘려보낸다
+                      (느린 모바일 클라이언트; 요청 하나가 I/O를 오래 기다리는 상황)
+
+    pip install gunicorn   # WSGI 서버 (hypercorn은 quart와 함께 설치됨)
+    python bench.py --concurrency 500 --requests 5000
+    python bench.py --scenario quiz --concurrency 50 --requests 100 --slow-clients 64
+"""
+
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+from config import QUIZ_QUESTION_COUNT
+
+WSGI_PORT = 8001
+ASGI_PORT = 8002
+WSGI_CMD = ["gunicorn", "--workers", "1", "--worker-class", "gthread", "--threads", "32",
+            "--bind", f"127.0.0.1:{WSGI_PORT}", "--log-level", "warning", "wsgi:application"]
+# hypercorn defaults (backlog 100, keep-alive 5s) turn high concurrency into
+# refused/closed connections on the ASGI side only; match gunicorn instead
+ASGI_CMD = ["hypercorn", "--workers", "1", "--backlog", "2048", "--keep-alive", "60",
+            "--bind", f"127.0.0.1:{ASGI_PORT}", "--log-level", "warning", "asgi:application"]
+
+
+async def wait_ready(base_url: str, timeout: float = 15.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(base_url + "/")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"server at {base_url} did not start")
+
+
+async def _timed(client: httpx.AsyncClient, method: str, path: str, latencies: list, errors: Counter,
+                 **kwargs) -> httpx.Response | None:
+    t0 = time.perf_counter()
+    resp = None
+    try:
+        resp = await client.request(method, path, **kwargs)
+        if resp.status_code >= 500:
+            errors[f"HTTP {resp.status_code}"] += 1
+    except httpx.HTTPError as e:
+        errors[type(e).__name__] += 1
+    latencies.append(time.perf_counter() - t0)
+    return resp
+
+
+async def hammer(base_url: str, path: str, total: int, concurrency: int) -> dict:
+    """total개의 요청을 동시 concurrency개로 보내고 통계를 반환한다."""
+    latencies = []
+    errors = Counter()
+    remaining = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker():
+            for _ in remaining:
+                await _timed(client, "GET", path, latencies, errors)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return _stats(latencies, errors, elapsed)
+
+
+async def quiz_flow(base_url: str, total: int, concurrency: int) -> dict:
+    """사용자 concurrency명이 퀴즈 total판을 나눠 푼다. 사용자마다 쿠키 세션을 따로 쓴다."""
+    latencies = []
+    errors = Counter()
+    remaining = iter(range(total))
+    answer = {"title": "사랑의 시", "lyrics": "그대 내게 오지 말아요 " * 3}
+
+    async def user():
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            for _ in remaining:
+                client.cookies.clear()
+                await _timed(client, "POST", "/quiz/start", latencies, errors,
+                             data={"difficulty": "mixed", "mode": "lyrics"})
+                for _ in range(QUIZ_QUESTION_COUNT):
+                    await _timed(client, "GET", "/quiz/question", latencies, errors)
+                    await _timed(client, "POST", "/quiz/answer", latencies, errors, data=answer)
+                resp = await _timed(client, "GET", "/quiz/result", latencies, errors)
+                if resp is not None and resp.status_code != 200:
+                    errors[f"result HTTP {resp.status_code}"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stats = _stats(latencies, errors, elapsed)
+    stats["flows_per_s"] = total / elapsed
+    return stats
+
+
+async def slow_client(port: int, interval: float, stop: asyncio.Event):
+    """/quiz/answer 본문을 interval초마다 한 바이트씩 보내는 연결을 계속 유지한다."""
+    body = b"title=" + b"x" * 63
+    head = (f"POST /quiz/answer HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+            f"Content-Type: application/x-www-form-urlencoded\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode()
+    while not stop.is_set():
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            await asyncio.sleep(interval)
+            continue
+        try:
+            writer.write(head)
+            for i in range(len(body)):
+                if stop.is_set():
+                    break
+                writer.write(body[i:i + 1])
+                await writer.drain()
+                await asyncio.sleep(interval)
+            else:
+                await reader.read(65536)
+        except OSError:
+            pass
+        finally:
+            writer.close()
+
+
+async def measure(port: int, args) -> dict:
+    base_url = f"http://127.0.0.1:{port}"
+    stop = asyncio.Event()
+    slow = [asyncio.create_task(slow_client(port, args.slow_interval, stop))
+            for _ in range(args.slow_clients)]
+    if slow:
+        await asyncio.sleep(2)  # 느린 연결이 자리를 잡은 뒤 측정
+    try:
+        if args.scenario == "quiz":
+            return await quiz_flow(base_url, args.requests, args.concurrency)
+        return await hammer(base_url, args.path, args.requests, args.concurrency)
+    finally:
+        stop.set()
+        for task in slow:
+            task.cancel()
+        await asyncio.gather(*slow, return_exceptions=True)
+
+
+def _stats(latencies: list[float], errors: Counter, elapsed: float) -> dict:
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": sum(errors.values()),
+        "error_kinds": dict(errors),
+    }
+
+
+def run_mode(name: str, cmd: list[str], port: int, args) -> dict:
+    proc = subprocess.Popen(cmd)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        asyncio.run(wait_ready(base_url))
+        asyncio.run(hammer(base_url, args.path, 200, 10))  # warm-up
+        stats = asyncio.run(measure(port, args))
+    finally:
+        proc.terminate()
+        proc.wait()
+    flows = f"  {stats['flows_per_s']:6.1f} quiz/s" if "flows_per_s" in stats else ""
+    print(f"{name:5} {stats['rps']:9.1f} req/s{flows}  p50 {stats['p50_ms']:7.1f}ms  "
+          f"p99 {stats['p99_ms']:7.1f}ms  errors {stats['errors']} {stats['error_kinds'] or ''}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=["get", "quiz"], default="get")
+    parser.add_argument("--path", default="/", help="GET path for --scenario get")
+    parser.add_argument("--requests", type=int, default=5000, help="requests (get) or quiz plays (quiz)")
+    parser.add_argument("--concurrency", type=int, default=500, help="connections (get) or users (quiz)")
+    parser.add_argument("--slow-clients", type=int, default=0)
+    parser.add_argument("--slow-interval", type=float, default=0.5, help="seconds between body bytes")
+    parser.add_argument("--only", choices=["wsgi", "asgi"])
+    args = parser.parse_args()
+
+    what = f"GET {args.path}" if args.scenario == "get" else "quiz flow"
+    print(f"{what}  requests={args.requests}  concurrency={args.concurrency}  "
+          f"slow_clients={args.slow_clients}")
+    if args.only != "asgi":
+        run_mode("wsgi", WSGI_CMD, WSGI_PORT, args)
+    if args.only != "wsgi":
+        run_mode("asgi", ASGI_CMD, ASGI_PORT, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,7 @@
 """한글 초성 추출 모듈."""
 
+import re
+
 CHOSUNG_LIST = [
     "ㄱ", "ㄲ", "ㄴ", "ㄷ", "ㄸ", "ㄹ", "ㅁ", "ㅂ", "ㅃ",
     "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅉ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ",
@@ -8,6 +10,8 @@ CHOSUNG_LIST = [
 HANGUL_START = 0xAC00
 HANGUL_END = 0xD7A3
 
+_NON_WORD = re.compile(r"\W+")
+
 
 def extract_chosung(text: str) -> str:
     """텍스트에서 한글 초성을 추출한다. 공백 유지, 비한글은 그대로."""
@@ -27,6 +31,19 @@ def count_korean_chars(text: str) -> int:
     return sum(1 for ch in text if HANGUL_START <= ord(ch) <= HANGUL_END)
 
 
+def compact(text: str) -> str:
+    """공백/문장부호를 제거하고 소문자로 바꾼다."""
+    return _NON_WORD.sub("", text).lower()
+
+
+def decompose(ch: str) -> tuple[int, int, int] | None:
+    """한글 음절을 (초성, 중성, 종성) 인덱스로 분해한다. 한글이 아니면 None."""
+    code = ord(ch) - HANGUL_START
+    if not 0 <= code <= HANGUL_END - HANGUL_START:
+        return None
+    return code // 588, (code % 588) // 28, code % 28
+
+
 if __name__ == "__main__":
     test = "그대 내게 오지 말아요"
     print(f"원문: {test}")
@@ -7,6 +7,7 @@ from datetime import datetime, timezone
 import httpx
 
 from config import OPENROUTER_API_KEY
+from corpus import update_classify_cache, classify_key
 from db import init_db, get_unclassified_lines, upsert_quiz_line, get_difficulty_stats
 
 OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
@@ -94,10 +95,19 @@ def classify_all():
 
         try:
             results = classify_batch(batch)
+            by_id = {line["id"]: line for line in batch}
+            cached = {}
             for r in results:
                 if r.get("difficulty") in ("easy", "normal", "hard", "very_hard"):
                     upsert_quiz_line(r["id"], r["difficulty"], now)
                     classified += 1
+                    line = by_id.get(r["id"])
+                    if line:
+                        cached[classify_key(line["track_id"], line["line_no"])] = {
+                            "line_text": line["line_text"], "difficulty": r["difficulty"], "classified_at": now,
+                        }
+            # Keep results for rebuild.py (offline, no LLM calls)
+            update_classify_cache(cached)
         except Exception as e:
             print(f"    Error: {e}")
             continue
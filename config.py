@@ -16,3 +16,12 @@ BUGS_ARTIST_ID = "32585"  # MC THE MAX
 SCRAPE_DELAY = 1.5  # seconds between requests
 QUIZ_QUESTION_COUNT = 10
 MAX_SCORE_PER_QUESTION = 100
+DB_READ_WORKERS = int(os.getenv("DB_READ_WORKERS", "8"))  # asgi.py DB 조회 스레드 수
+INDEX_STATS_TTL = 10  # seconds, 메인 페이지 통계 캐시
+SEARCH_RESULT_LIMIT = 30
+SEARCH_MIN_QUERY_CHARS = 2  # 공백/문장부호 제외
+SEARCH_INDEX_TTL = 30  # seconds, 크롤링 중 검색 인덱스 재생성 간격 (rebuild.py 교체는 즉시)
+LYRICS_ANSWER_MAX_CHARS = 300  # 가사 답안 입력 상한 (채점 비용 제한)
+LYRICS_EXCERPT_CHARS = 40  # 세션(쿠키)에 남기는 가사 답안 길이
+RAW_DIR = DB_PATH.parent / "raw"  # 원본 가사 캐시 (rebuild.py 입력)
+BUILD_DIR = DB_PATH.parent / "build"  # rebuild.py 단계별 산출물
@@ -0,0 +1,100 @@
+"""원본 가사 저장소와 가사 정규화.
+
+크롤링한 가사를 트랙별 JSON(RAW_DIR/<track_id>.json)으로 보관하고,
+LLM 분류 결과를 RAW_DIR/classify.json 에 "track_id:line_no" 키로 보관한다
+(분류 당시 가사도 함께 저장해서 줄 번호가 밀리면 알아챌 수 있게).
+rebuild.py는 이 두 가지만 보고 오프라인으로 DB를 다시 만든다.
+"""
+
+import json
+import os
+import unicodedata
+
+from chosung import count_korean_chars
+from config import RAW_DIR
+
+CLASSIFY_CACHE = RAW_DIR / "classify.json"
+
+
+def normalize_line(line: str) -> str:
+    """가사 한 줄 정규화: NFC, 앞뒤/연속 공백 정리."""
+    return " ".join(unicodedata.normalize("NFC", line).split())
+
+
+def normalize_lyrics(lyrics: str) -> list[tuple[int, str]]:
+    """원본 가사를 (line_no, 줄) 목록으로. 한글 2자 미만 줄은 번호만 차지하고 빠진다."""
+    lines = []
+    for line_no, line in enumerate(lyrics.split("\n"), 1):
+        line = normalize_line(line)
+        if line and count_korean_chars(line) >= 2:
+            lines.append((line_no, line))
+    return lines
+
+
+def _write_json(path, data):
+    """임시 파일에 쓴 뒤 교체해서 중간 상태의 파일이 남지 않게 한다."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, sort_keys=True, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# --- Raw lyrics ---
+
+def save_raw_track(track_id: int, title: str, album: str | None, scraped_at: str, lyrics: str | None):
+    _write_json(RAW_DIR / f"{track_id}.json", {
+        "track_id": track_id,
+        "title": title,
+        "album": album,
+        "scraped_at": scraped_at,
+        "lyrics": lyrics or "",
+    })
+
+
+def lyrics_from_lines(lines: list[tuple[int, str]]) -> str:
+    """DB의 (line_no, 줄) 목록을 원본 형태로 되돌린다. 빠진 번호는 빈 줄로 채워 line_no를 유지한다."""
+    text = [""] * max((no for no, _ in lines), default=0)
+    for no, line in lines:
+        text[no - 1] = line
+    return "\n".join(text)
+
+
+def update_raw_meta(track_id: int, title: str, album: str | None, scraped_at: str,
+                    lines: list[tuple[int, str]]):
+    """가사는 그대로 두고 곡 정보만 갱신한다. 원본 파일이 없으면 DB의 줄(lines)로 만든다."""
+    path = RAW_DIR / f"{track_id}.json"
+    if path.exists():
+        lyrics = json.loads(path.read_text(encoding="utf-8"))["lyrics"]
+    else:
+        lyrics = lyrics_from_lines(lines)
+    save_raw_track(track_id, title, album, scraped_at, lyrics)
+
+
+def raw_track_paths() -> list:
+    """원본 트랙 파일 목록 (track_id 순)."""
+    if not RAW_DIR.exists():
+        return []
+    return sorted((p for p in RAW_DIR.glob("*.json") if p.stem.isdigit()), key=lambda p: int(p.stem))
+
+
+def load_raw_tracks() -> list[dict]:
+    return [json.loads(p.read_text(encoding="utf-8")) for p in raw_track_paths()]
+
+
+# --- Classification cache ---
+
+def load_classify_cache() -> dict[str, dict]:
+    """"track_id:line_no" → {"line_text", "difficulty", "classified_at"}."""
+    if not CLASSIFY_CACHE.exists():
+        return {}
+    return json.loads(CLASSIFY_CACHE.read_text(encoding="utf-8"))
+
+
+def update_classify_cache(entries: dict[str, dict]):
+    cache = load_classify_cache()
+    cache.update(entries)
+    _write_json(CLASSIFY_CACHE, cache)
+
+
+def classify_key(track_id: int, line_no: int) -> str:
+    return f"{track_id}:{line_no}"
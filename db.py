@@ -1,6 +1,7 @@
 """SQLite database schema and query functions."""
 
 import sqlite3
+import threading
 from contextlib import contextmanager
 from config import DB_PATH
 
@@ -24,33 +25,61 @@ def get_db():
         conn.close()
 
 
+_read_local = threading.local()
+
+
+def get_read_conn() -> sqlite3.Connection:
+    """현재 스레드 전용 읽기 전용 커넥션. DB 파일이 교체되면 새로 연다."""
+    st = DB_PATH.stat()
+    ident = (st.st_dev, st.st_ino)
+    conn = getattr(_read_local, "conn", None)
+    if conn is None or _read_local.ident != ident:
+        if conn is not None:
+            conn.close()
+        conn = sqlite3.connect(f"{DB_PATH.as_uri()}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        _read_local.conn = conn
+        _read_local.ident = ident
+    return conn
+
+
+@contextmanager
+def get_read_db():
+    """조회 전용. 커넥션은 스레드별로 재사용하므로 닫지 않는다."""
+    yield get_read_conn()
+
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS songs (
+        track_id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        album TEXT,
+        scraped_at TEXT
+    );
+    CREATE TABLE IF NOT EXISTS lyrics_lines (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        track_id INTEGER NOT NULL,
+        line_no INTEGER NOT NULL,
+        line_text TEXT NOT NULL,
+        chosung TEXT NOT NULL,
+        char_count INTEGER NOT NULL,
+        FOREIGN KEY (track_id) REFERENCES songs(track_id),
+        UNIQUE(track_id, line_no)
+    );
+    CREATE TABLE IF NOT EXISTS quiz_lines (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        lyrics_line_id INTEGER NOT NULL UNIQUE,
+        difficulty TEXT NOT NULL CHECK(difficulty IN ('easy','normal','hard','very_hard')),
+        classified_at TEXT,
+        FOREIGN KEY (lyrics_line_id) REFERENCES lyrics_lines(id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_quiz_lines_difficulty ON quiz_lines(difficulty);
+"""
+
+
 def init_db():
     with get_db() as conn:
-        conn.executescript("""
-            CREATE TABLE IF NOT EXISTS songs (
-                track_id INTEGER PRIMARY KEY,
-                title TEXT NOT NULL,
-                album TEXT,
-                scraped_at TEXT
-            );
-            CREATE TABLE IF NOT EXISTS lyrics_lines (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                track_id INTEGER NOT NULL,
-                line_no INTEGER NOT NULL,
-                line_text TEXT NOT NULL,
-                chosung TEXT NOT NULL,
-                char_count INTEGER NOT NULL,
-                FOREIGN KEY (track_id) REFERENCES songs(track_id),
-                UNIQUE(track_id, line_no)
-            );
-            CREATE TABLE IF NOT EXISTS quiz_lines (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                lyrics_line_id INTEGER NOT NULL UNIQUE,
-                difficulty TEXT NOT NULL CHECK(difficulty IN ('easy','normal','hard','very_hard')),
-                classified_at TEXT,
-                FOREIGN KEY (lyrics_line_id) REFERENCES lyrics_lines(id)
-            );
-        """)
+        conn.executescript(SCHEMA)
 
 
 # --- Song queries ---
@@ -65,13 +94,13 @@ def upsert_song(track_id: int, title: str, album: str | None, scraped_at: str):
 
 
 def get_song(track_id: int) -> dict | None:
-    with get_db() as conn:
+    with get_read_db() as conn:
         row = conn.execute("SELECT * FROM songs WHERE track_id=?", (track_id,)).fetchone()
         return dict(row) if row else None
 
 
 def get_all_songs() -> list[dict]:
-    with get_db() as conn:
+    with get_read_db() as conn:
         return [dict(r) for r in conn.execute("SELECT * FROM songs ORDER BY title").fetchall()]
 
 
@@ -87,14 +116,51 @@ def insert_lyrics_line(track_id: int, line_no: int, line_text: str, chosung: str
 
 
 def get_lyrics_for_song(track_id: int) -> list[dict]:
-    with get_db() as conn:
+    with get_read_db() as conn:
         return [dict(r) for r in conn.execute(
             "SELECT * FROM lyrics_lines WHERE track_id=? ORDER BY line_no", (track_id,)
         ).fetchall()]
 
 
+def get_search_corpus() -> list[dict]:
+    """검색 인덱스용 전체 가사 줄 (곡명 포함)."""
+    with get_read_db() as conn:
+        return [dict(r) for r in conn.execute(
+            "SELECT ll.id, ll.track_id, ll.line_no, ll.line_text, ll.chosung, s.title "
+            "FROM lyrics_lines ll JOIN songs s ON ll.track_id = s.track_id "
+            "ORDER BY ll.id"
+        ).fetchall()]
+
+
+def get_build_id() -> int:
+    """rebuild.py가 DB를 교체할 때 찍는 빌드 id (PRAGMA user_version). 한 번도 안 했으면 0."""
+    with get_read_db() as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def get_corpus_version() -> tuple:
+    """가사/곡 테이블이 바뀌었는지 판단하기 위한 값.
+
+    크롤링으로 줄/곡이 추가되면 개수가, rebuild.py로 교체되면 빌드 id가 바뀐다.
+    """
+    with get_read_db() as conn:
+        return tuple(conn.execute(
+            "SELECT (SELECT COUNT(*) FROM lyrics_lines), (SELECT MAX(id) FROM lyrics_lines), "
+            "(SELECT COUNT(*) FROM songs)"
+        ).fetchone()) + (get_build_id(),)
+
+
+def get_quiz_version() -> tuple:
+    """퀴즈 문제(quiz_lines)까지 포함한 버전. 분류가 추가/교체되어도 바뀐다."""
+    with get_read_db() as conn:
+        quiz = tuple(conn.execute(
+            "SELECT COUNT(*), MAX(id) FROM quiz_lines"
+        ).fetchone())
+    return get_corpus_version() + quiz
+
+
 def get_unclassified_lines(limit: int = 200) -> list[dict]:
-    with get_db() as conn:
+    with get_read_db() as conn:
         return [dict(r) for r in conn.execute(
             "SELECT ll.* FROM lyrics_lines ll "
             "LEFT JOIN quiz_lines ql ON ll.id = ql.lyrics_line_id "
@@ -124,7 +190,7 @@ def upsert_quiz_line(lyrics_line_id: int, difficulty: str, classified_at: str):
 
 
 def get_quiz_questions(difficulty: str, count: int = 10) -> list[dict]:
-    with get_db() as conn:
+    with get_read_db() as conn:
         rows = conn.execute(
             "SELECT ql.id as quiz_id, ql.difficulty, ll.id as line_id, "
             "ll.line_text, ll.chosung, ll.char_count, ll.line_no, ll.track_id, "
@@ -145,7 +211,7 @@ def get_quiz_questions_mixed(count: int = 10) -> list[dict]:
     """혼합 난이도: easy 2, normal 3, hard 3, very_hard 2."""
     questions = []
     distribution = [("easy", 2), ("normal", 3), ("hard", 3), ("very_hard", 2)]
-    with get_db() as conn:
+    with get_read_db() as conn:
         for diff, n in distribution:
             rows = conn.execute(
                 "SELECT ql.id as quiz_id, ql.difficulty, ll.id as line_id, "
@@ -165,7 +231,7 @@ def get_quiz_questions_mixed(count: int = 10) -> list[dict]:
 
 
 def get_quiz_question_by_id(quiz_id: int) -> dict | None:
-    with get_db() as conn:
+    with get_read_db() as conn:
         row = conn.execute(
             "SELECT ql.id as quiz_id, ql.difficulty, ll.id as line_id, "
             "ll.line_text, ll.chosung, ll.char_count, ll.line_no, ll.track_id, "
@@ -181,8 +247,55 @@ def get_quiz_question_by_id(quiz_id: int) -> dict | None:
         return _merge_two_lines(dict(row)) if row else None
 
 
+def get_quiz_questions_for_lines(line_ids: list[int]) -> list[dict]:
+    """주어진 가사 줄을 포함하는(첫 줄 또는 둘째 줄) 퀴즈 문제. line_ids 순서를 따른다."""
+    if not line_ids:
+        return []
+    placeholders = ",".join("?" * len(line_ids))
+    with get_read_db() as conn:
+        rows = conn.execute(
+            "SELECT ql.id as quiz_id, ql.difficulty, ll.id as line_id, "
+            "ll.line_text, ll.chosung, ll.char_count, ll.line_no, ll.track_id, "
+            "ll2.id as line_id_2, "
+            "ll2.line_text as line_text_2, ll2.chosung as chosung_2, ll2.char_count as char_count_2, "
+            "s.title "
+            "FROM quiz_lines ql "
+            "JOIN lyrics_lines ll ON ql.lyrics_line_id = ll.id "
+            "JOIN lyrics_lines ll2 ON ll2.track_id = ll.track_id AND ll2.line_no = ll.line_no + 1 "
+            "JOIN songs s ON ll.track_id = s.track_id "
+            f"WHERE ll.id IN ({placeholders}) OR ll2.id IN ({placeholders})",
+            (*line_ids, *line_ids),
+        ).fetchall()
+    rank = {line_id: i for i, line_id in enumerate(line_ids)}
+    questions = []
+    for r in rows:
+        q = dict(r)
+        line_id_2 = q.pop("line_id_2")
+        q["_rank"] = min(rank.get(q["line_id"], len(rank)), rank.get(line_id_2, len(rank)))
+        questions.append(q)
+    questions.sort(key=lambda q: q.pop("_rank"))
+    return [_merge_two_lines(q) for q in questions]
+
+
+def get_quiz_lyrics(quiz_ids: list[int]) -> dict[int, str]:
+    """quiz_id → 2줄 가사 (채점용)."""
+    if not quiz_ids:
+        return {}
+    placeholders = ",".join("?" * len(quiz_ids))
+    with get_read_db() as conn:
+        rows = conn.execute(
+            "SELECT ql.id as quiz_id, ll.line_text, ll2.line_text as line_text_2 "
+            "FROM quiz_lines ql "
+            "JOIN lyrics_lines ll ON ql.lyrics_line_id = ll.id "
+            "JOIN lyrics_lines ll2 ON ll2.track_id = ll.track_id AND ll2.line_no = ll.line_no + 1 "
+            f"WHERE ql.id IN ({placeholders})",
+            quiz_ids,
+        ).fetchall()
+        return {r["quiz_id"]: r["line_text"] + "\n" + r["line_text_2"] for r in rows}
+
+
 def get_difficulty_stats() -> dict:
-    with get_db() as conn:
+    with get_read_db() as conn:
         rows = conn.execute(
             "SELECT difficulty, COUNT(*) as cnt FROM quiz_lines GROUP BY difficulty"
         ).fetchall()
@@ -190,12 +303,12 @@ def get_difficulty_stats() -> dict:
 
 
 def get_total_songs() -> int:
-    with get_db() as conn:
+    with get_read_db() as conn:
         return conn.execute("SELECT COUNT(*) FROM songs").fetchone()[0]
 
 
 def get_total_lines() -> int:
-    with get_db() as conn:
+    with get_read_db() as conn:
         return conn.execute("SELECT COUNT(*) FROM lyrics_lines").fetchone()[0]
 
 
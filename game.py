@@ -0,0 +1,128 @@
+"""퀴즈 진행/채점 로직. Flask(app.py)와 Quart(asgi.py) 양쪽에서 쓴다.
+
+웹 프레임워크에 의존하지 않는다. 세션은 dict처럼 다루는 객체를 받는다.
+"""
+
+import re
+import time
+
+from config import QUIZ_QUESTION_COUNT, LYRICS_EXCERPT_CHARS, INDEX_STATS_TTL
+from grading import grade_text, grade_lyrics, EXACT_SCORE
+from search import search
+from db import (
+    get_quiz_questions, get_quiz_questions_mixed, get_quiz_questions_for_lines,
+    get_difficulty_stats, get_total_songs, get_total_lines,
+)
+
+
+def normalize_title(title: str) -> str:
+    """곡명 비교를 위해 정규화 (괄호 안 버전 정보 제거, 소문자, 공백 제거)."""
+    title = re.sub(r"\(.*?\)", "", title)  # remove parenthetical
+    title = re.sub(r"[^\w가-힣]", "", title)  # keep only word chars + hangul
+    return title.strip().lower()
+
+
+def check_lyrics(answer: str, correct: str) -> tuple[int, str]:
+    """가사 정답 체크. (점수, 판정)을 반환."""
+    return grade_text(answer, correct)
+
+
+_index_cache = {"at": 0.0, "ctx": None}
+
+
+def cached_index_context() -> dict | None:
+    """INDEX_STATS_TTL초 안에 만든 통계가 있으면 DB 접근 없이 돌려준다."""
+    if _index_cache["ctx"] is not None and time.monotonic() - _index_cache["at"] < INDEX_STATS_TTL:
+        return _index_cache["ctx"]
+    return None
+
+
+def index_context() -> dict:
+    """메인 페이지 통계. 매 요청 3번의 COUNT 쿼리를 피하려고 잠깐 캐시한다."""
+    stats = get_difficulty_stats()
+    ctx = {
+        "stats": stats,
+        "total_songs": get_total_songs(),
+        "total_lines": get_total_lines(),
+        "total_quiz": sum(stats.values()),
+    }
+    _index_cache["ctx"], _index_cache["at"] = ctx, time.monotonic()
+    return ctx
+
+
+def load_questions(difficulty: str) -> list[dict]:
+    """난이도에 맞는 문제를 뽑는다."""
+    if difficulty == "mixed":
+        return get_quiz_questions_mixed(QUIZ_QUESTION_COUNT)
+    return get_quiz_questions(difficulty, QUIZ_QUESTION_COUNT)
+
+
+def load_practice_questions(query: str) -> list[dict]:
+    """검색 결과에 걸린 가사로 연습 문제를 만든다 (매치 순, 같은 가사는 한 번만)."""
+    line_ids = [line_id for line in search(query)["lines"] for line_id in line["line_ids"]]
+    questions = []
+    seen = set()
+    for q in get_quiz_questions_for_lines(line_ids):
+        if q["line_text"] in seen:
+            continue
+        seen.add(q["line_text"])
+        questions.append(q)
+        if len(questions) == QUIZ_QUESTION_COUNT:
+            break
+    return questions
+
+
+def start_quiz(sess, questions: list[dict], difficulty: str, mode: str = "title"):
+    """세션에 새 퀴즈를 기록한다. 정답은 저장하지 않는다. mode: title | lyrics"""
+    # Session stores only IDs + display info (no answers)
+    sess["quiz_ids"] = [q["quiz_id"] for q in questions]
+    sess["quiz_display"] = [
+        {"chosung": q["chosung"], "char_count": q["char_count"], "difficulty": q["difficulty"]}
+        for q in questions
+    ]
+    sess["current"] = 0
+    sess["score"] = 0
+    sess["results"] = []
+    sess["difficulty"] = difficulty
+    sess["mode"] = mode
+
+
+def grade_answer(q: dict, current: int, title_answer: str, lyrics_answer: str | None = None) -> dict:
+    """곡명(가사 모드면 가사도) 답안을 채점해 결과 dict를 만든다."""
+    correct = normalize_title(title_answer) == normalize_title(q["title"])
+    result = {
+        "question_no": current + 1,
+        "chosung": q["chosung"],
+        "correct_title": q["title"],
+        "correct_lyrics": q["line_text"],
+        "user_title": title_answer,
+        "correct": correct,
+        "score": 100 if correct else 0,
+        "difficulty": q.get("difficulty", ""),
+    }
+    if lyrics_answer is not None:
+        lyrics_score, verdict = grade_lyrics([(q["quiz_id"], lyrics_answer)])[0]
+        # 결과는 쿠키 세션에 쌓이므로 답안은 앞부분만 남긴다 (쿠키 4KB 제한)
+        excerpt = " ".join(lyrics_answer.split())
+        if len(excerpt) > LYRICS_EXCERPT_CHARS:
+            excerpt = excerpt[:LYRICS_EXCERPT_CHARS] + "…"
+        result["user_lyrics"] = excerpt
+        result["lyrics_score"] = lyrics_score
+        result["lyrics_verdict"] = verdict
+        result["score"] += lyrics_score
+        result["max_score"] = 100 + EXACT_SCORE
+    return result
+
+
+def quiz_total(results: list[dict]) -> int:
+    """결과 목록의 만점."""
+    return sum(r.get("max_score", 100) for r in results) or 1
+
+
+def record_result(sess, result: dict):
+    """채점 결과를 세션에 누적하고 다음 문제로 넘어간다."""
+    sess["score"] = sess.get("score", 0) + result["score"]
+    results = sess.get("results", [])
+    results.append(result)
+    sess["results"] = results
+    sess["current"] = sess.get("current", 0) + 1
@@ -0,0 +1,105 @@
+"""가사 답안 채점 모듈.
+
+정규화(공백/문장부호 제거, 소문자)한 음절 단위로 편집 거리를 잰다.
+한글 음절끼리의 치환 비용은 초성/중성/종성 중 다른 자모 수 / 3 이라서
+'사랑'→'사람'처럼 받침 하나 틀린 답은 0.33만 깎인다.
+허용 거리(max_dist)를 넘는 순간 계산을 멈추고, 대각선 밴드 안만 계산하므로
+비용은 O(정답 길이 × max_dist)로 묶인다. 입력 길이도 잘라서 받는다.
+"""
+
+import threading
+
+from chosung import compact, decompose
+from config import LYRICS_ANSWER_MAX_CHARS
+from db import get_quiz_lyrics, get_quiz_version
+
+EXACT_SCORE = 50
+PARTIAL_SCORE = 25
+PARTIAL_SIMILARITY = 0.8
+
+_INF = float("inf")
+
+
+def to_units(text: str) -> tuple:
+    """채점용 음절 단위. 한글은 (초, 중, 종) 튜플, 그 외 글자는 그대로."""
+    return tuple(decompose(ch) or ch for ch in compact(text[:LYRICS_ANSWER_MAX_CHARS]))
+
+
+def _unit_cost(a, b) -> float:
+    if a == b:
+        return 0.0
+    if type(a) is tuple and type(b) is tuple:
+        return ((a[0] != b[0]) + (a[1] != b[1]) + (a[2] != b[2])) / 3
+    return 1.0
+
+
+def edit_distance(a: tuple, b: tuple, max_dist: float) -> float | None:
+    """자모 가중 편집 거리. max_dist를 넘으면 None (조기 종료)."""
+    n, m = len(a), len(b)
+    if abs(n - m) > max_dist:
+        return None
+    band = int(max_dist)
+    prev = [j if j <= band else _INF for j in range(m + 1)]
+    for i in range(1, n + 1):
+        cur = [_INF] * (m + 1)
+        if i <= band:
+            cur[0] = i
+        row_min = cur[0]
+        ai = a[i - 1]
+        for j in range(max(1, i - band), min(m, i + band) + 1):
+            d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + _unit_cost(ai, b[j - 1]))
+            cur[j] = d
+            if d < row_min:
+                row_min = d
+        if row_min > max_dist:
+            return None
+        prev = cur
+    return prev[m] if prev[m] <= max_dist else None
+
+
+def grade_units(answer: tuple, correct: tuple) -> tuple[int, str]:
+    """정규화된 답안/정답으로 (점수, 판정)을 반환한다."""
+    if not answer:
+        return 0, "wrong"
+    if answer == correct:
+        return EXACT_SCORE, "exact"
+    max_dist = (1 - PARTIAL_SIMILARITY) * len(correct)
+    if edit_distance(answer, correct, max_dist) is not None:
+        return PARTIAL_SCORE, "partial"
+    return 0, "wrong"
+
+
+def grade_text(answer: str, correct: str) -> tuple[int, str]:
+    """캐시 없이 문자열 두 개를 바로 채점한다."""
+    return grade_units(to_units(answer), to_units(correct))
+
+
+# --- quiz_id별 정답 캐시 ---
+
+_correct_units: dict[int, tuple] = {}
+_cache_version = None
+_cache_lock = threading.Lock()
+
+
+def _load_correct(quiz_ids: list[int]) -> dict[int, tuple]:
+    global _cache_version
+    version = get_quiz_version()
+    with _cache_lock:
+        if version != _cache_version:
+            _correct_units.clear()
+            _cache_version = version
+        missing = [qid for qid in set(quiz_ids) if qid not in _correct_units]
+        if missing:
+            for qid, text in get_quiz_lyrics(missing).items():
+                _correct_units[qid] = to_units(text)
+        return {qid: _correct_units.get(qid) for qid in quiz_ids}
+
+
+def grade_lyrics(answers: list[tuple[int, str]]) -> list[tuple[int, str]]:
+    """(quiz_id, 답안) 목록을 한 번에 채점한다. 한 게임 전체도 DB 조회 한 번으로 끝난다."""
+    correct = _load_correct([qid for qid, _ in answers])
+    results = []
+    for qid, answer in answers:
+        units = correct.get(qid)
+        results.append(grade_units(to_units(answer), units) if units else (0, "wrong"))
+    return results
@@ -0,0 +1,468 @@
+"""오프라인 코퍼스 재구축 파이프라인.
+
+원본 가사 저장소(RAW_DIR)와 분류 캐시만으로 quiz.db를 처음부터 다시 만든다.
+네트워크/LLM 호출은 없다.
+
+    1. normalize  원본 가사 → (line_no, 정규화된 줄)
+    2. derive     초성, 한글 글자 수
+    3. pair       line_no / line_no + 1 짝이 있는 퀴즈 후보 줄
+    4. classify   분류 캐시에서 난이도 조회
+    5. index      임시 DB 생성 (스키마, 인덱스, ANALYZE)
+    6. validate   무결성/짝/초성 검사
+    7. swap       라이브 DB 대비 문제 손실 확인 후 SQLite backup API로 한 트랜잭션에 교체
+
+각 단계의 입력 해시(입력 산출물 + 단계 코드)를 BUILD_DIR/manifest.json에 기록하고,
+같으면 저장된 산출물을 그대로 쓴다. 결과는 입력(원본, 분류 캐시, 라이브 DB의 id)이
+같으면 항상 같다. 기존 줄/문제의 id는 라이브 DB 값을 그대로 유지한다.
+
+    python rebuild.py                 # 바뀐 단계만 다시 실행
+    python rebuild.py --force --jobs 8
+    python rebuild.py --seed-from-db  # 현재 DB로 원본 저장소/분류 캐시 채우기 (최초 1회)
+    python rebuild.py --allow-drop    # 라이브 문제가 빠지는 빌드도 스왑 (의도한 경우만)
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import chosung
+import corpus
+from chosung import extract_chosung, count_korean_chars, compact
+from config import DB_PATH, BUILD_DIR
+from corpus import (
+    normalize_lyrics, raw_track_paths, load_raw_tracks, save_raw_track, lyrics_from_lines,
+    CLASSIFY_CACHE, load_classify_cache, update_classify_cache, classify_key,
+)
+from db import SCHEMA
+
+QUIZ_MIN_CHARS = 5  # classify.py와 같은 기준
+MAX_QUIZ_SHRINK = 0.05  # 라이브 대비 플레이 가능한 문제가 이 비율 넘게 줄면 스왑 거부
+MANIFEST = BUILD_DIR / "manifest.json"
+BUILD_DB = BUILD_DIR / "quiz.db"
+
+
+class ValidationError(Exception):
+    pass
+
+
+# --- helpers ---
+
+def _sha(*parts: bytes) -> str:
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(hashlib.sha256(p).digest())
+    return h.hexdigest()
+
+
+def _code_hash(*objs) -> bytes:
+    """단계 코드(함수 또는 의존 모듈 전체)가 바뀌면 다시 돌도록 소스를 해시에 넣는다."""
+    return "".join(inspect.getsource(o) for o in objs).encode()
+
+
+def _dump(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _parallel_map(fn, items: list, jobs: int) -> list:
+    """순서를 유지하는 map. jobs > 1이면 프로세스 풀을 쓴다."""
+    if jobs <= 1 or len(items) < 2:
+        return [fn(item) for item in items]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(fn, items, chunksize=max(1, len(items) // (jobs * 4))))
+
+
+class Manifest:
+    def __init__(self, force: bool):
+        self.force = force
+        self.data = json.loads(MANIFEST.read_text()) if MANIFEST.exists() else {}
+
+    def run(self, name: str, input_hash: str, build):
+        """입력 해시가 같으면 저장된 산출물을 읽고, 아니면 build()를 실행해 저장한다."""
+        path = BUILD_DIR / f"{name}.json"
+        t0 = time.perf_counter()
+        if not self.force and self.data.get(name) == input_hash and path.exists():
+            raw = path.read_bytes()
+            print(f"  {name:9} skipped (unchanged)")
+        else:
+            raw = _dump(build())
+            path.write_bytes(raw)
+            self.data[name] = input_hash
+            self.save()
+            print(f"  {name:9} done in {time.perf_counter() - t0:.2f}s")
+        return json.loads(raw), hashlib.sha256(raw).hexdigest()
+
+    def save(self):
+        tmp = MANIFEST.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data, indent=1, sort_keys=True))
+        os.replace(tmp, MANIFEST)
+
+
+# --- stage workers (module level so they can be pickled) ---
+
+def _normalize_track(track: dict) -> list:
+    return [track["track_id"], normalize_lyrics(track["lyrics"])]
+
+
+def _derive_track(item: list) -> list:
+    track_id, lines = item
+    return [track_id, [[no, text, extract_chosung(text), count_korean_chars(text)] for no, text in lines]]
+
+
+# --- stages ---
+
+def stage_normalize(m: Manifest, jobs: int):
+    paths = raw_track_paths()
+    if not paths:
+        raise ValidationError("raw store is empty; run scraper.py or --seed-from-db first")
+    raw_hash = _sha(*(p.name.encode() + p.read_bytes() for p in paths))
+    input_hash = _sha(raw_hash.encode(), _code_hash(_normalize_track, corpus, chosung))
+
+    def build():
+        tracks = load_raw_tracks()
+        songs = [[t["track_id"], t["title"], t["album"], t["scraped_at"]] for t in tracks]
+        return {"songs": songs, "lines": _parallel_map(_normalize_track, tracks, jobs)}
+
+    return m.run("normalize", input_hash, build)
+
+
+def stage_derive(m: Manifest, jobs: int, normalized: dict, upstream: str):
+    input_hash = _sha(upstream.encode(), _code_hash(_derive_track, chosung))
+
+    def build():
+        return {"songs": normalized["songs"], "lines": _parallel_map(_derive_track, normalized["lines"], jobs)}
+
+    return m.run("derive", input_hash, build)
+
+
+def stage_pair(m: Manifest, derived: dict, upstream: str):
+    input_hash = _sha(upstream.encode(), _code_hash(stage_pair), str(QUIZ_MIN_CHARS).encode())
+
+    def build():
+        pairs = []
+        for track_id, lines in derived["lines"]:
+            line_nos = {line[0] for line in lines}
+            for no, text, _, char_count in lines:
+                if char_count >= QUIZ_MIN_CHARS and no + 1 in line_nos:
+                    pairs.append([track_id, no, text])
+        return pairs
+
+    return m.run("pair", input_hash, build)
+
+
+def stage_classify(m: Manifest, pairs: list, upstream: str):
+    cache_bytes = CLASSIFY_CACHE.read_bytes() if CLASSIFY_CACHE.exists() else b""
+    input_hash = _sha(upstream.encode(), cache_bytes, _code_hash(stage_classify))
+
+    def build():
+        cache = load_classify_cache()
+        classified = []
+        for track_id, no, text in pairs:
+            entry = cache.get(classify_key(track_id, no))
+            # 원본 가사가 바뀌어 line_no가 밀렸으면 그 분류는 쓰지 않는다
+            if entry and compact(entry["line_text"]) == compact(text):
+                classified.append([track_id, no, entry["difficulty"], entry.get("classified_at")])
+        print(f"    {len(classified)}/{len(pairs)} pairs classified "
+              f"({len(pairs) - len(classified)} need classify.py)")
+        return classified
+
+    return m.run("classify", input_hash, build)
+
+
+def _live_ids() -> dict:
+    """라이브 DB의 (track_id, line_no) → id 와 AUTOINCREMENT 시퀀스."""
+    ids = {"lyrics_lines": [], "quiz_lines": [], "seq": {}}
+    if not DB_PATH.exists():
+        return ids
+    conn = sqlite3.connect(f"{DB_PATH.as_uri()}?mode=ro", uri=True)
+    try:
+        ids["lyrics_lines"] = [list(r) for r in conn.execute(
+            "SELECT track_id, line_no, id FROM lyrics_lines ORDER BY id")]
+        ids["quiz_lines"] = [list(r) for r in conn.execute(
+            "SELECT ll.track_id, ll.line_no, ql.id FROM quiz_lines ql "
+            "JOIN lyrics_lines ll ON ql.lyrics_line_id = ll.id ORDER BY ql.id")]
+        ids["seq"] = dict(conn.execute("SELECT name, seq FROM sqlite_sequence").fetchall())
+    except sqlite3.OperationalError:  # schema not created yet
+        pass
+    finally:
+        conn.close()
+    return ids
+
+
+def _assign_ids(keys: list, live: list, floor: int) -> dict:
+    """이미 있던 (track_id, line_no)는 라이브 id를 그대로 쓰고, 새 줄은 그 뒤 번호를 받는다."""
+    live_map = {(track_id, no): id_ for track_id, no, id_ in live}
+    next_id = max([floor, *live_map.values()]) + 1
+    ids = {}
+    for key in keys:
+        if key in live_map:
+            ids[key] = live_map[key]
+        else:
+            ids[key] = next_id
+            next_id += 1
+    return ids
+
+
+def stage_index(m: Manifest, derived: dict, classified: list, upstream: str):
+    """임시 DB를 만든다.
+
+    진행 중인 게임의 세션이 quiz_id를 들고 있으므로 id는 라이브 DB와 같게 유지한다.
+    배정된 id도 입력 해시에 넣는다 (스왑 직후에도 배정이 같으므로 다시 건너뛴다).
+    """
+    live = _live_ids()
+    lines = sorted(((track_id, no), (text, cho, count))
+                   for track_id, track_lines in derived["lines"] for no, text, cho, count in track_lines)
+    line_ids = _assign_ids([key for key, _ in lines], live["lyrics_lines"],
+                           live["seq"].get("lyrics_lines", 0))
+    quiz = sorted(((track_id, no), (diff, at)) for track_id, no, diff, at in classified)
+    quiz_ids = _assign_ids([key for key, _ in quiz], live["quiz_lines"],
+                           live["seq"].get("quiz_lines", 0))
+    # 지워진 줄의 id를 나중에 다시 쓰지 않도록 시퀀스도 라이브 값 이상으로 맞춘다
+    seqs = {table: max([live["seq"].get(table, 0), *ids.values()])
+            for table, ids in (("lyrics_lines", line_ids), ("quiz_lines", quiz_ids))}
+
+    assignment = _dump([sorted(line_ids.values()), sorted(quiz_ids.values()), seqs])
+    input_hash = _sha(upstream.encode(), assignment, _code_hash(stage_index, _assign_ids), SCHEMA.encode())
+    if not m.force and m.data.get("index") == input_hash and BUILD_DB.exists():
+        print(f"  {'index':9} skipped (unchanged)")
+        return
+    t0 = time.perf_counter()
+    tmp = BUILD_DB.with_suffix(".tmp")
+    tmp.unlink(missing_ok=True)
+    conn = sqlite3.connect(str(tmp))
+    try:
+        conn.executescript(SCHEMA)
+        conn.executemany("INSERT INTO songs(track_id, title, album, scraped_at) VALUES(?,?,?,?)",
+                         sorted(derived["songs"]))
+        conn.executemany(
+            "INSERT INTO lyrics_lines(id, track_id, line_no, line_text, chosung, char_count) VALUES(?,?,?,?,?,?)",
+            [(line_ids[key], *key, *values) for key, values in lines],
+        )
+        conn.executemany(
+            "INSERT INTO quiz_lines(id, lyrics_line_id, difficulty, classified_at) VALUES(?,?,?,?)",
+            [(quiz_ids[key], line_ids[key], diff, at) for key, (diff, at) in quiz],
+        )
+        for table, seq in seqs.items():
+            conn.execute("DELETE FROM sqlite_sequence WHERE name=?", (table,))
+            conn.execute("INSERT INTO sqlite_sequence(name, seq) VALUES(?,?)", (table, seq))
+        # 빌드 id. 스왑 때 함께 복사되어 검색 인덱스/채점 캐시가 바뀐 것을 알아챈다
+        conn.execute(f"PRAGMA user_version = {int(input_hash[:7], 16) or 1}")
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, BUILD_DB)
+    m.data["index"] = input_hash
+    m.data.pop("validate", None)
+    m.save()
+    print(f"  {'index':9} done in {time.perf_counter() - t0:.2f}s")
+
+
+def stage_validate(m: Manifest, derived: dict, classified: list):
+    db_hash = hashlib.sha256(BUILD_DB.read_bytes()).hexdigest()
+    if not m.force and m.data.get("validate") == db_hash:
+        print(f"  {'validate':9} skipped (unchanged)")
+        return db_hash
+    t0 = time.perf_counter()
+    conn = sqlite3.connect(f"{BUILD_DB.as_uri()}?mode=ro", uri=True)
+    try:
+        errors = []
+        if conn.execute("PRAGMA integrity_check").fetchone()[0] != "ok":
+            errors.append("integrity_check failed")
+        if conn.execute("PRAGMA foreign_key_check").fetchall():
+            errors.append("foreign key violations")
+
+        n_songs = conn.execute("SELECT COUNT(*) FROM songs").fetchone()[0]
+        n_lines = conn.execute("SELECT COUNT(*) FROM lyrics_lines").fetchone()[0]
+        n_quiz = conn.execute("SELECT COUNT(*) FROM quiz_lines").fetchone()[0]
+        expected_lines = sum(len(lines) for _, lines in derived["lines"])
+        if n_songs != len(derived["songs"]) or n_lines != expected_lines or n_quiz != len(classified):
+            errors.append(f"row counts differ: songs {n_songs}/{len(derived['songs'])}, "
+                          f"lyrics_lines {n_lines}/{expected_lines}, quiz_lines {n_quiz}/{len(classified)}")
+        if n_lines == 0 or n_quiz == 0:
+            errors.append(f"empty corpus: {n_lines} lines, {n_quiz} quiz lines")
+
+        unpaired = conn.execute(
+            "SELECT COUNT(*) FROM quiz_lines ql "
+            "JOIN lyrics_lines ll ON ql.lyrics_line_id = ll.id "
+            "LEFT JOIN lyrics_lines ll2 ON ll2.track_id = ll.track_id AND ll2.line_no = ll.line_no + 1 "
+            "WHERE ll2.id IS NULL"
+        ).fetchone()[0]
+        if unpaired:
+            errors.append(f"{unpaired} quiz lines without a line_no + 1 partner")
+
+        stale = sum(
+            1 for text, chosung, char_count in conn.execute(
+                "SELECT line_text, chosung, char_count FROM lyrics_lines")
+            if chosung != extract_chosung(text) or char_count != count_korean_chars(text)
+        )
+        if stale:
+            errors.append(f"{stale} lines with stale chosung/char_count")
+    finally:
+        conn.close()
+
+    if errors:
+        raise ValidationError("; ".join(errors))
+    m.data["validate"] = db_hash
+    m.save()
+    print(f"  {'validate':9} ok ({n_songs} songs, {n_lines} lines, {n_quiz} quiz) "
+          f"in {time.perf_counter() - t0:.2f}s")
+    return db_hash
+
+
+_PLAYABLE_QUIZ_SQL = (
+    "SELECT ll.track_id, ll.line_no, ll.line_text FROM quiz_lines ql "
+    "JOIN lyrics_lines ll ON ql.lyrics_line_id = ll.id "
+    "JOIN lyrics_lines ll2 ON ll2.track_id = ll.track_id AND ll2.line_no = ll.line_no + 1"
+)
+
+
+def check_live_drops(allow_drop: bool):
+    """빌드가 라이브 DB의 플레이 가능한 문제를 잃지 않는지 확인한다.
+
+    가사가 그대로인데 빌드에서 빠진 문제가 있거나(분류 캐시가 비어 있는 등),
+    전체 문제 수가 MAX_QUIZ_SHRINK 넘게 줄면 allow_drop 없이는 스왑하지 않는다.
+    """
+    if not DB_PATH.exists():
+        return
+    live_conn = sqlite3.connect(f"{DB_PATH.as_uri()}?mode=ro", uri=True)
+    build_conn = sqlite3.connect(f"{BUILD_DB.as_uri()}?mode=ro", uri=True)
+    try:
+        try:
+            live = live_conn.execute(_PLAYABLE_QUIZ_SQL).fetchall()
+        except sqlite3.OperationalError:  # schema not created yet
+            return
+        build_quiz = {(t, no) for t, no, _ in build_conn.execute(_PLAYABLE_QUIZ_SQL)}
+        build_text = {(t, no): compact(text) for t, no, text in build_conn.execute(
+            "SELECT track_id, line_no, line_text FROM lyrics_lines")}
+    finally:
+        live_conn.close()
+        build_conn.close()
+
+    dropped = [(t, no) for t, no, text in live
+               if (t, no) not in build_quiz and build_text.get((t, no)) == compact(text)]
+    problems = []
+    if dropped:
+        problems.append(f"{len(dropped)} live quiz lines with unchanged lyrics would be dropped "
+                        f"(e.g. {dropped[:3]}); is the classify cache seeded?")
+    if len(build_quiz) < len(live) * (1 - MAX_QUIZ_SHRINK):
+        problems.append(f"playable quiz lines would shrink {len(live)} → {len(build_quiz)}")
+    if problems and not allow_drop:
+        raise ValidationError("; ".join(problems) + " (use --allow-drop to swap anyway)")
+    for p in problems:
+        print(f"    warning: {p}")
+
+
+def stage_swap(m: Manifest, db_hash: str, allow_drop: bool = False):
+    """빌드 DB를 라이브 DB에 한 번에 복사한다.
+
+    라이브 DB는 WAL 모드라 파일을 os.replace로 바꾸면 열려 있는 커넥션과
+    -wal/-shm 파일이 어긋날 수 있다. backup API는 한 트랜잭션으로 전체 페이지를
+    덮어쓰므로, 읽는 쪽은 이전 DB 또는 완성된 새 DB만 보게 된다.
+    """
+    if not m.force and m.data.get("swap") == db_hash and DB_PATH.exists():
+        print(f"  {'swap':9} skipped (live DB already has this build)")
+        return
+    t0 = time.perf_counter()
+    check_live_drops(allow_drop)
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    src = sqlite3.connect(f"{BUILD_DB.as_uri()}?mode=ro", uri=True)
+    dst = sqlite3.connect(str(DB_PATH), timeout=30)
+    try:
+        dst.execute("PRAGMA journal_mode=WAL")
+        src.backup(dst)
+        dst.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        src.close()
+        dst.close()
+    m.data["swap"] = db_hash
+    m.save()
+    print(f"  {'swap':9} done in {time.perf_counter() - t0:.2f}s → {DB_PATH}")
+
+
+def rebuild(jobs: int = os.cpu_count() or 1, force: bool = False, swap: bool = True,
+            allow_drop: bool = False):
+    BUILD_DIR.mkdir(parents=True, exist_ok=True)
+    m = Manifest(force)
+    t0 = time.perf_counter()
+    normalized, h = stage_normalize(m, jobs)
+    derived, h_derived = stage_derive(m, jobs, normalized, h)
+    pairs, h = stage_pair(m, derived, h_derived)
+    classified, h_classified = stage_classify(m, pairs, h)
+    stage_index(m, derived, classified, _sha(h_derived.encode(), h_classified.encode()))
+    db_hash = stage_validate(m, derived, classified)
+    if swap:
+        stage_swap(m, db_hash, allow_drop)
+    print(f"Rebuild finished in {time.perf_counter() - t0:.2f}s")
+
+
+def seed_from_db(force: bool = False):
+    """현재 DB의 가사/분류 결과로 원본 저장소와 분류 캐시를 채운다.
+
+    걸러진 줄(한글 2자 미만)은 빈 줄로 채워 line_no를 그대로 유지한다.
+    이미 있는 원본 파일과 분류 캐시 항목은 force 없이는 덮어쓰지 않는다
+    (크롤링한 원본에는 DB에서 걸러진 줄까지 들어 있다).
+    """
+    existing_raw = {p.stem for p in raw_track_paths()}
+    cache = load_classify_cache()
+    conn = sqlite3.connect(str(DB_PATH))
+    conn.row_factory = sqlite3.Row
+    seeded = 0
+    try:
+        songs = conn.execute("SELECT * FROM songs ORDER BY track_id").fetchall()
+        for s in songs:
+            if not force and str(s["track_id"]) in existing_raw:
+                continue
+            lines = conn.execute("SELECT line_no, line_text FROM lyrics_lines WHERE track_id=? "
+                                 "ORDER BY line_no", (s["track_id"],)).fetchall()
+            save_raw_track(s["track_id"], s["title"], s["album"], s["scraped_at"],
+                           lyrics_from_lines([tuple(line) for line in lines]))
+            seeded += 1
+        rows = conn.execute(
+            "SELECT ll.track_id, ll.line_no, ll.line_text, ql.difficulty, ql.classified_at "
+            "FROM quiz_lines ql JOIN lyrics_lines ll ON ql.lyrics_line_id = ll.id"
+        ).fetchall()
+        entries = {
+            classify_key(r["track_id"], r["line_no"]): {"line_text": r["line_text"], "difficulty": r["difficulty"],
+                                                        "classified_at": r["classified_at"]}
+            for r in rows
+        }
+        if not force:
+            entries = {k: v for k, v in entries.items() if k not in cache}
+        update_classify_cache(entries)
+    finally:
+        conn.close()
+    print(f"Seeded {seeded}/{len(songs)} tracks and {len(entries)}/{len(rows)} classifications from {DB_PATH}"
+          + ("" if force else " (existing raw files and cache entries kept)"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline quiz.db rebuild")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--force", action="store_true",
+                        help="ignore cached stage outputs; with --seed-from-db, overwrite existing raw files")
+    parser.add_argument("--no-swap", action="store_true", help="build and validate only")
+    parser.add_argument("--allow-drop", action="store_true",
+                        help="swap even if live quiz lines would be dropped")
+    parser.add_argument("--seed-from-db", action="store_true")
+    args = parser.parse_args()
+
+    if args.seed_from_db:
+        seed_from_db(args.force)
+        return 0
+    try:
+        rebuild(args.jobs, args.force, swap=not args.no_swap, allow_drop=args.allow_drop)
+    except ValidationError as e:
+        print(f"Rebuild aborted, live DB untouched: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
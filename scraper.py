@@ -16,6 +16,7 @@ from bs4 import BeautifulSoup
 
 from chosung import extract_chosung, count_korean_chars
 from config import BUGS_ARTIST_ID, SCRAPE_DELAY
+from corpus import normalize_lyrics, save_raw_track, update_raw_meta
 from db import init_db, upsert_song, insert_lyrics_line, get_song, get_total_songs, get_total_lines
 
 HEADERS = {
@@ -140,20 +141,23 @@ def scrape_all():
         if get_song(t["track_id"]):
             # Check if we already have lyrics
             from db import get_lyrics_for_song
-            if get_lyrics_for_song(t["track_id"]):
+            existing = get_lyrics_for_song(t["track_id"])
+            if existing:
+                # Title/album may have changed; keep the raw store in sync for rebuild.py
+                update_raw_meta(t["track_id"], t["title"], t["album"], now,
+                                [(l["line_no"], l["line_text"]) for l in existing])
                 print(f"  [{i}/{len(tracks)}] {t['title']} - already has lyrics, skipping")
                 continue
 
         print(f"  [{i}/{len(tracks)}] Fetching lyrics: {t['title']}...")
         lyrics = fetch_lyrics(t["track_id"])
+        # Keep the raw text so rebuild.py can reprocess offline
+        save_raw_track(t["track_id"], t["title"], t["album"], now, lyrics)
         if not lyrics:
             print(f"    No lyrics found.")
             continue
 
-        for line_no, line in enumerate(lyrics.split("\n"), 1):
-            line = line.strip()
-            if not line or count_korean_chars(line) < 2:
-                continue
+        for line_no, line in normalize_lyrics(lyrics):
             chosung = extract_chosung(line)
             char_count = count_korean_chars(line)
             insert_lyrics_line(t["track_id"], line_no, line, chosung, char_count)
@@ -0,0 +1,178 @@
+"""초성/한글 가사 검색 모듈 (메모리 n-gram 인덱스).
+
+가사 줄마다 공백/문장부호를 뺀 키(text_key)와 그 초성(cho_key)을 만들고,
+cho_key의 1~3-gram → 줄 번호 목록을 미리 색인한다. 검색어도 초성으로 바꿔
+가장 드문 n-gram의 후보만 검증하므로 LIKE '%…%' 전체 스캔이 없다.
+검색어의 완성형 글자는 해당 위치의 가사 글자와 정확히 같아야 한다.
+한 글자 검색은 거의 모든 줄에 걸려서(수십 ms) 받지 않는다.
+"""
+
+import threading
+import time
+
+from chosung import extract_chosung, compact, HANGUL_START, HANGUL_END
+from config import SEARCH_RESULT_LIMIT, SEARCH_MIN_QUERY_CHARS, SEARCH_INDEX_TTL
+from db import get_search_corpus, get_corpus_version, get_build_id
+
+NGRAM = 3
+
+
+def _word_starts(text: str) -> frozenset[int]:
+    """compact(text) 기준으로 각 단어가 시작하는 위치."""
+    starts = set()
+    pos = 0
+    for word in text.split():
+        key = compact(word)
+        if key:
+            starts.add(pos)
+            pos += len(key)
+    return frozenset(starts)
+
+
+class SearchIndex:
+    def __init__(self, rows: list[dict]):
+        self.lines = []
+        self.postings: dict[str, list[int]] = {}
+        for i, row in enumerate(rows):
+            text_key = compact(row["line_text"])
+            cho_key = extract_chosung(text_key)
+            self.lines.append({
+                **row,
+                "text_key": text_key,
+                "cho_key": cho_key,
+                "word_starts": _word_starts(row["line_text"]),
+            })
+            for n in range(1, NGRAM + 1):
+                for j in range(len(cho_key) - n + 1):
+                    plist = self.postings.setdefault(cho_key[j:j + n], [])
+                    if not plist or plist[-1] != i:
+                        plist.append(i)
+
+    def _candidates(self, q_cho: str) -> list[int]:
+        if len(q_cho) <= NGRAM:
+            return self.postings.get(q_cho, [])
+        grams = (q_cho[j:j + NGRAM] for j in range(len(q_cho) - NGRAM + 1))
+        return min((self.postings.get(g, []) for g in grams), key=len)
+
+    def _score(self, line: dict, q: str, q_cho: str, syllables: list[int],
+               q_word_starts: list[int]) -> float | None:
+        """가장 좋은 매치 위치의 점수. 매치가 없으면 None.
+
+        줄 처음(+2) 또는 단어 처음(+1)에서 시작하면 가산하고, 검색어의 나머지 단어도
+        가사의 단어 경계와 맞아떨어진 비율만큼(최대 +1) 더한다.
+        """
+        cho_key, text_key, word_starts = line["cho_key"], line["text_key"], line["word_starts"]
+        best = None
+        pos = cho_key.find(q_cho)
+        while pos != -1:
+            if all(text_key[pos + k] == q[k] for k in syllables):
+                score = len(q) / len(text_key)  # coverage
+                if pos == 0:
+                    score += 2
+                elif pos in word_starts:
+                    score += 1
+                if q_word_starts:
+                    score += sum(pos + k in word_starts for k in q_word_starts) / len(q_word_starts)
+                if best is None or score > best:
+                    best = score
+            pos = cho_key.find(q_cho, pos + 1)
+        return best
+
+    def search(self, query: str, limit: int = SEARCH_RESULT_LIMIT) -> dict:
+        """같은 곡의 같은 가사(반복 구절)는 가장 좋은 한 줄만 세고, 여러 곡에 똑같이 있는
+        가사는 한 결과로 묶는다(also_in: 나머지 곡명, line_ids: 묶인 줄 전부)."""
+        q = compact(query)
+        if len(q) < SEARCH_MIN_QUERY_CHARS:
+            return {"lines": [], "songs": [], "too_short": True}
+        q_cho = extract_chosung(q)
+        syllables = [k for k, ch in enumerate(q) if HANGUL_START <= ord(ch) <= HANGUL_END]
+        q_word_starts = sorted(_word_starts(query) - {0})
+
+        best: dict[tuple[int, str], tuple[float, int]] = {}  # (track_id, text_key) → (score, i)
+        for i in self._candidates(q_cho):
+            line = self.lines[i]
+            score = self._score(line, q, q_cho, syllables, q_word_starts)
+            if score is None:
+                continue
+            key = (line["track_id"], line["text_key"])
+            if key not in best or score > best[key][0]:
+                best[key] = (score, i)
+
+        songs: dict[int, dict] = {}
+        groups: dict[str, list[tuple[float, int]]] = {}
+        for (track_id, text_key), (score, i) in best.items():
+            groups.setdefault(text_key, []).append((score, i))
+            song = songs.get(track_id)
+            if song is None:
+                songs[track_id] = {"track_id": track_id, "title": self.lines[i]["title"],
+                                   "hits": 1, "score": score}
+            else:
+                song["hits"] += 1
+                song["score"] = max(song["score"], score)
+
+        ranked = sorted((sorted(g, key=lambda h: (-h[0], h[1])) for g in groups.values()),
+                        key=lambda g: (-g[0][0], g[0][1]))
+        lines = []
+        for g in ranked[:limit]:
+            score, i = g[0]
+            lines.append(
+                {k: self.lines[i][k] for k in ("id", "track_id", "title", "line_no", "line_text", "chosung")}
+                | {"score": round(score, 3),
+                   "also_in": [self.lines[j]["title"] for _, j in g[1:]],
+                   "line_ids": [self.lines[j]["id"] for _, j in g]}
+            )
+        ranked_songs = sorted(songs.values(), key=lambda s: (-s["score"], -s["hits"], s["title"]))
+        for s in ranked_songs:
+            s["score"] = round(s["score"], 3)
+        return {"lines": lines, "songs": ranked_songs[:limit], "too_short": False}
+
+
+_index: SearchIndex | None = None
+_index_version = None
+_index_checked_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_index() -> SearchIndex:
+    """인덱스를 반환한다.
+
+    rebuild.py로 빌드 id가 바뀌면 바로, 크롤링으로 줄이 늘어난 것은 SEARCH_INDEX_TTL초에
+    한 번만 확인해 다시 만든다. 다른 스레드가 만드는 중이면 기다리지 않고 이전 인덱스를 쓴다.
+    """
+    global _index, _index_version, _index_checked_at
+    if _index is not None:
+        if time.monotonic() - _index_checked_at < SEARCH_INDEX_TTL and get_build_id() == _index_version[-1]:
+            return _index
+        if not _index_lock.acquire(blocking=False):
+            return _index
+    else:
+        _index_lock.acquire()
+    try:
+        version = get_corpus_version()
+        if _index is None or _index_version != version:
+            _index = SearchIndex(get_search_corpus())
+            _index_version = version
+        _index_checked_at = time.monotonic()
+    finally:
+        _index_lock.release()
+    return _index
+
+
+def search(query: str, limit: int = SEARCH_RESULT_LIMIT) -> dict:
+    """검색어(초성/한글 혼용 가능)에 맞는 가사 줄과 곡을 매치 품질 순으로 반환한다."""
+    return get_index().search(query, limit)
+
+
+if __name__ == "__main__":
+    import sys
+
+    t0 = time.perf_counter()
+    get_index()
+    print(f"Index built in {(time.perf_counter() - t0) * 1000:.1f}ms")
+    for q in sys.argv[1:] or ["ㄱㄷ ㄴㄱ", "그대", "ㅅㄹ해"]:
+        t0 = time.perf_counter()
+        res = search(q)
+        ms = (time.perf_counter() - t0) * 1000
+        print(f"\n{q!r}: {len(res['lines'])} lines, {len(res['songs'])} songs ({ms:.2f}ms)")
+        for line in res["lines"][:5]:
+            print(f"  {line['score']:.2f} [{line['title']}] {line['line_text']}")
@@ -6,6 +6,7 @@
     const submitBtn = document.getElementById("submit-btn");
     const skipBtn = document.getElementById("skip-btn");
     const nextBtn = document.getElementById("next-btn");
+    const lyricsInput = document.getElementById("lyrics");
 
     if (!form) return;
 
@@ -40,6 +41,7 @@
 
         const emoji = data.correct ? "\ud83d\ude03" : "\ud83e\udd72";
         const scoreClass = data.correct ? "good" : "bad";
+        const lyricsClass = { exact: "correct", partial: "partial", wrong: "wrong" }[data.lyrics_verdict];
 
         resultContent.innerHTML = `
             <div class="result-emoji">${emoji}</div>
@@ -47,6 +49,7 @@
             <div class="answer-detail">
                 <div>정답: <strong>${esc(data.correct_title)}</strong></div>
                 ${data.user_title ? '<div>내 답: ' + esc(data.user_title) + '</div>' : ''}
+                ${data.lyrics_verdict ? '<div>내 가사: <span class="' + lyricsClass + '">' + esc(data.user_lyrics || '-') + '</span> +' + data.lyrics_score + '</div>' : ''}
                 <div style="margin-top:8px">가사: <strong>${esc(data.correct_lyrics).replace(/\n/g, '<br>')}</strong></div>
             </div>
         `;
@@ -56,6 +59,7 @@
 
     skipBtn.addEventListener("click", function () {
         document.getElementById("title").value = "";
+        if (lyricsInput) lyricsInput.value = "";
         submitAnswer(null);
     });
 
@@ -66,7 +70,20 @@
     document.getElementById("title").addEventListener("keydown", function (e) {
         if (e.key === "Enter") {
             e.preventDefault();
-            submitAnswer(null);
+            if (lyricsInput) {
+                lyricsInput.focus();
+            } else {
+                submitAnswer(null);
+            }
         }
     });
+
+    if (lyricsInput) {
+        lyricsInput.addEventListener("keydown", function (e) {
+            if (e.key === "Enter" && !e.shiftKey) {
+                e.preventDefault();
+                submitAnswer(null);
+            }
+        });
+    }
 })();